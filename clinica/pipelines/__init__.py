@@ -1,21 +1,43 @@
-from .. import pydra  # noqa
-from . import (
-    deeplearning_prepare_data,
-    dwi,
-    machine_learning,
-    machine_learning_spatial_svm,
-    pet,
-    pet_surface,
-    statistics_surface,
-    statistics_volume,
-    statistics_volume_correction,
-    anatomical,
-    t1_linear,
-    t1_volume,
-    t1_volume_create_dartel,
-    t1_volume_dartel2mni,
-    t1_volume_existing_template,
-    t1_volume_parcellation,
-    t1_volume_register_dartel,
-    t1_volume_tissue_segmentation,
-)
+"""Clinica pipelines.
+
+Pipeline subpackages are imported lazily, on first attribute access, so that
+importing `clinica.pipelines` does not pay for the heavy Nipype / SPM imports
+of every pipeline. Importing a subpackage registers its command in `clinica run`.
+"""
+
+import importlib
+
+__all__ = [
+    "deeplearning_prepare_data",
+    "dwi",
+    "machine_learning",
+    "machine_learning_spatial_svm",
+    "pet",
+    "pet_surface",
+    "statistics_surface",
+    "statistics_volume",
+    "statistics_volume_correction",
+    "anatomical",
+    "t1_linear",
+    "t1_volume",
+    "t1_volume_create_dartel",
+    "t1_volume_dartel2mni",
+    "t1_volume_existing_template",
+    "t1_volume_parcellation",
+    "t1_volume_register_dartel",
+    "t1_volume_tissue_segmentation",
+]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        from .. import pydra  # noqa
+
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
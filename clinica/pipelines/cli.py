@@ -2,11 +2,26 @@ import click
 
 
 class RegistrationOrderGroup(click.Group):
-    """CLI group which lists commands by order or registration."""
+    """CLI group which lists commands by order or registration.
+
+    Pipeline subpackages register their own command when imported, so they
+    are loaded here, the first time the group needs to know its commands.
+    """
+
+    def _load_pipelines(self) -> None:
+        import clinica.pipelines
+
+        for name in clinica.pipelines.__all__:
+            getattr(clinica.pipelines, name)
 
     def list_commands(self, ctx):
+        self._load_pipelines()
         return self.commands.keys()
 
+    def get_command(self, ctx, cmd_name):
+        self._load_pipelines()
+        return super().get_command(ctx, cmd_name)
+
 
 @click.group(cls=RegistrationOrderGroup, name="run")
 def cli() -> None:
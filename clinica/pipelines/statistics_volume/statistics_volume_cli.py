@@ -69,6 +69,7 @@ pipeline_name = "statistics-volume"
 @cli_param.option_group.option(
     "-ct",
     "--cluster_threshold",
+    type=click.FloatRange(0, 1),
     default=0.001,
     show_default=True,
     help="Threshold to define a cluster in the process of cluster-wise correction.",
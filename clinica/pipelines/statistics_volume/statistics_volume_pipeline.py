@@ -1,8 +1,81 @@
-from typing import List
+import os
+import re
+from pathlib import Path
+from types import MappingProxyType
+from typing import List, Tuple
+
+import nipype.interfaces.utility as nutil
+import nipype.pipeline.engine as npe
 
 from clinica.pipelines.engine import GroupPipeline
 from clinica.utils.pet import SUVRReferenceRegion, Tracer
 
+# Default values of the optional parameters of the pipeline
+_DEFAULTS = MappingProxyType(
+    {
+        "group_label_dartel": "*",
+        "full_width_at_half_maximum": 8,
+        # Optional parameters for inputs from pet-volume pipeline
+        "acq_label": None,
+        "suvr_reference_region": None,
+        "use_pvc_data": False,
+        # Optional parameters for custom pipeline
+        "measure_label": None,
+        "custom_file": None,
+        # Advanced parameters
+        "cluster_threshold": 0.001,
+    }
+)
+
+# Paths to the SPM .m templates, and their content read once instead of at each pipeline run
+_TEMPLATE_FILES = {
+    name: str(Path(__file__).parent / f"template_model_{name}.m")
+    for name in ("creation", "estimation", "contrast", "results")
+}
+_TEMPLATES = {name: Path(path).read_text() for name, path in _TEMPLATE_FILES.items()}
+
+
+def _build_regexp_substitutions(
+    base_dir: Path, group_id: str, measure_label: str, fwhm: int
+) -> List[Tuple[str, str]]:
+    """Build the DataSink substitutions of the StatisticsVolume pipeline.
+
+    The output directory is escaped so that characters such as '.' or '+'
+    in its path are matched literally.
+    """
+    base = str(base_dir)
+    escaped_base = re.escape(base)
+    return [
+        # t-stat map
+        (rf"{escaped_base}/spm_results_analysis_./(.*)", rf"{base}/\1"),
+        # contrasts
+        (rf"{escaped_base}/contrasts/(.*)", rf"{base}/\1"),
+        # resels per voxels
+        (
+            rf"{escaped_base}/resels_per_voxels/resels_per_voxel\.nii",
+            f"{base}/{group_id}_RPV.nii",
+        ),
+        # mask
+        (
+            rf"{escaped_base}/mask\ /included_voxel_mask\.nii",
+            f"{base}/{group_id}_mask.nii",
+        ),
+        # variance of error
+        (rf"{escaped_base}/variance_of_error/(.*)", rf"{base}/\1"),
+        # tsv file
+        (
+            rf"{escaped_base}/tsv_file/.*",
+            f"{base}/{os.pardir}/{group_id}_participants.tsv",
+        ),
+        # report (figures)
+        (rf"{escaped_base}/figures/(.*)", rf"{base}/\1"),
+        # regression coefficient
+        (
+            rf"{escaped_base}/regression_coeff/(.*).nii",
+            rf"{base}/{group_id}_covariate-\1_measure-{measure_label}_fwhm-{fwhm}_regressionCoefficient.nii",
+        ),
+    ]
+
 
 class StatisticsVolume(GroupPipeline):
     """StatisticsVolume - Volume-based mass-univariate analysis with SPM.
@@ -11,6 +84,10 @@ class StatisticsVolume(GroupPipeline):
         A clinica pipeline object containing the StatisticsVolume pipeline.
     """
 
+    # Whether input images need to be decompressed before being given to SPM.
+    # It is only known once the input files have been grabbed in `_build_input_node`.
+    _needs_unzip: bool = True
+
     def _check_pipeline_parameters(self) -> None:
         """Check pipeline parameters."""
         from clinica.utils.exceptions import ClinicaException
@@ -24,31 +101,19 @@ class StatisticsVolume(GroupPipeline):
             raise KeyError("Missing compulsory contrast key in pipeline parameter.")
 
         # Optional parameters
-        self.parameters.setdefault("group_label_dartel", "*")
-        self.parameters.setdefault("full_width_at_half_maximum", 8)
+        self.parameters.update({**_DEFAULTS, **self.parameters})
 
         # Optional parameters for inputs from pet-volume pipeline
-        self.parameters.setdefault("acq_label", None)
         if self.parameters["acq_label"]:
             self.parameters["acq_label"] = Tracer(self.parameters["acq_label"])
-        self.parameters.setdefault("suvr_reference_region", None)
         if self.parameters["suvr_reference_region"]:
             self.parameters["suvr_reference_region"] = SUVRReferenceRegion(
                 self.parameters["suvr_reference_region"]
             )
-        self.parameters.setdefault("use_pvc_data", False)
-
-        # Optional parameters for custom pipeline
-        self.parameters.setdefault("measure_label", None)
-        self.parameters.setdefault("custom_file", None)
-
-        # Advanced parameters
-        self.parameters.setdefault("cluster_threshold", 0.001)
 
-        if (
-            self.parameters["cluster_threshold"] < 0
-            or self.parameters["cluster_threshold"] > 1
-        ):
+        # The command line already restricts the range of the cluster threshold,
+        # this check covers pipelines instantiated from Python
+        if not 0 <= self.parameters["cluster_threshold"] <= 1:
             raise ClinicaException(
                 "Cluster threshold should be between 0 and 1 "
                 "(given value: %s)." % self.parameters["cluster_threshold"]
@@ -89,8 +154,7 @@ class StatisticsVolume(GroupPipeline):
 
     def _build_input_node(self):
         """Build and connect an input node to the pipeline."""
-        import nipype.interfaces.utility as nutil
-        import nipype.pipeline.engine as npe
+        from logging import INFO, getLogger
 
         from clinica.utils.exceptions import ClinicaException
         from clinica.utils.input_files import (
@@ -150,6 +214,7 @@ class StatisticsVolume(GroupPipeline):
         input_files, self.subjects, self.sessions = clinica_file_filter(
             self.subjects, self.sessions, self.caps_directory, information_dict
         )
+        self._needs_unzip = any(f.endswith(".gz") for f in input_files)
 
         read_parameters_node = npe.Node(
             name="LoadingCLIArguments",
@@ -160,7 +225,8 @@ class StatisticsVolume(GroupPipeline):
         )
         read_parameters_node.inputs.input_files = input_files
 
-        if len(self.subjects):
+        # Listing the images is only worth it if the messages are displayed
+        if self.subjects and getLogger("clinica").isEnabledFor(INFO):
             print_images_to_process(self.subjects, self.sessions)
             cprint(
                 "The pipeline will last a few minutes. Images generated by SPM will popup during the pipeline."
@@ -173,10 +239,7 @@ class StatisticsVolume(GroupPipeline):
 
     def _build_output_node(self):
         """Build and connect an output node to the pipeline."""
-        from os.path import pardir
-
         import nipype.interfaces.io as nio
-        import nipype.pipeline.engine as npe
 
         base_dir = (
             self.group_directory
@@ -189,87 +252,36 @@ class StatisticsVolume(GroupPipeline):
 
         datasink.inputs.parameterization = True
         if self.parameters["full_width_at_half_maximum"]:
-            datasink.inputs.regexp_substitutions = [
-                # t-stat map
-                (
-                    str(base_dir) + r"/spm_results_analysis_./(.*)",
-                    str(base_dir) + r"/\1",
-                ),
-                # contrasts
-                (
-                    str(base_dir) + r"/contrasts/(.*)",
-                    str(base_dir) + r"/\1",
-                ),
-                # resels per voxels
-                (
-                    str(base_dir / "resels_per_voxels" / "resels_per_voxel.nii"),
-                    str(base_dir / f"{self.group_id}_RPV.nii"),
-                ),
-                # mask
-                (
-                    str(base_dir / "mask " / "included_voxel_mask.nii"),
-                    str(base_dir / f"{self.group_id}_mask.nii"),
-                ),
-                # variance of error
-                (
-                    str(base_dir / "variance_of_error") + r"/(.*)",
-                    str(base_dir) + r"/\1",
-                ),
-                # tsv file
-                (
-                    str(base_dir / "tsv_file") + r"/.*",
-                    str(base_dir / pardir / f"{self.group_id}_participants.tsv"),
-                ),
-                # report (figures)
-                (
-                    str(base_dir / "figures") + r"/(.*)",
-                    str(base_dir) + r"/\1",
-                ),
-                # regression coefficient
-                (
-                    str(base_dir / "regression_coeff") + r"/(.*).nii",
-                    (
-                        str(base_dir / f"{self.group_id}")
-                        + r"_covariate-\1"
-                        + f"_measure-{self.parameters['measure_label']}_fwhm-{self.parameters['full_width_at_half_maximum']}_regressionCoefficient.nii"
-                    ),
-                ),
-            ]
+            datasink.inputs.regexp_substitutions = _build_regexp_substitutions(
+                base_dir,
+                str(self.group_id),
+                self.parameters["measure_label"],
+                self.parameters["full_width_at_half_maximum"],
+            )
 
         datasink.inputs.tsv_file = str(self.tsv_file)
 
         self.connect(
             [
-                (self.output_node, datasink, [("spmT_0001", "spm_results_analysis_1")]),
-                (self.output_node, datasink, [("spmT_0002", "spm_results_analysis_2")]),
-                (self.output_node, datasink, [("spm_figures", "figures")]),
                 (
                     self.output_node,
                     datasink,
-                    [("variance_of_error", "variance_of_error")],
+                    [
+                        ("spmT_0001", "spm_results_analysis_1"),
+                        ("spmT_0002", "spm_results_analysis_2"),
+                        ("spm_figures", "figures"),
+                        ("variance_of_error", "variance_of_error"),
+                        ("resels_per_voxels", "resels_per_voxels"),
+                        ("mask", "mask"),
+                        ("regression_coeff", "regression_coeff"),
+                        ("contrasts", "contrasts"),
+                    ],
                 ),
-                (
-                    self.output_node,
-                    datasink,
-                    [("resels_per_voxels", "resels_per_voxels")],
-                ),
-                (self.output_node, datasink, [("mask", "mask")]),
-                (
-                    self.output_node,
-                    datasink,
-                    [("regression_coeff", "regression_coeff")],
-                ),
-                (self.output_node, datasink, [("contrasts", "contrasts")]),
             ]
         )
 
     def _build_core_nodes(self):
         """Build and connect the core nodes of the pipeline."""
-        from os.path import dirname, join
-
-        import nipype.interfaces.utility as nutil
-        import nipype.pipeline.engine as npe
-
         from clinica.pipelines.statistics_volume.statistics_volume_utils import (
             clean_spm_contrast_file,
             clean_spm_result_file,
@@ -284,16 +296,6 @@ class StatisticsVolume(GroupPipeline):
         def _getter(files: list, idx: int) -> str:
             return files[idx]
 
-        # SPM cannot handle zipped files
-        unzip_node = npe.Node(
-            nutil.Function(
-                input_names=["in_file"],
-                output_names=["output_files"],
-                function=unzip_nii,
-            ),
-            name="unzip_node",
-        )
-
         # Get indexes of the 2 groups, based on the contrast column of the tsv file
         get_groups = npe.Node(
             nutil.Function(
@@ -308,6 +310,9 @@ class StatisticsVolume(GroupPipeline):
         get_groups.inputs.tsv = self.tsv_file
 
         # Run SPM nodes are all a copy of a generic SPM script launcher
+        # They are not memoized on the content of their script: all SPM steps update
+        # the same SPM.mat in place, and model creation always recreates it, so a step
+        # skipped on an identical script would leave the model in an inconsistent state
         run_spm_script_node = npe.Node(
             nutil.Function(
                 input_names=["m_file"],
@@ -348,6 +353,7 @@ class StatisticsVolume(GroupPipeline):
                     "idx_group2",
                     "file_list",
                     "template_file",
+                    "template_str",
                 ],
                 output_names=["script_file", "covariates"],
                 function=write_matlab_model,
@@ -357,48 +363,56 @@ class StatisticsVolume(GroupPipeline):
         )
         model_creation.inputs.tsv = self.tsv_file
         model_creation.inputs.contrast = self.parameters["contrast"]
-        model_creation.inputs.template_file = join(
-            dirname(__file__), "template_model_creation.m"
-        )
+        model_creation.inputs.template_file = _TEMPLATE_FILES["creation"]
+        model_creation.inputs.template_str = _TEMPLATES["creation"]
 
         # 2. Model estimation
         model_estimation = npe.Node(
             nutil.Function(
-                input_names=["mat_file", "template_file"],
+                input_names=["mat_file", "template_file", "template_str"],
                 output_names=["script_file"],
                 function=clean_template_file,
             ),
             name="model_estimation",
         )
-        model_estimation.inputs.template_file = join(
-            dirname(__file__), "template_model_estimation.m"
-        )
+        model_estimation.inputs.template_file = _TEMPLATE_FILES["estimation"]
+        model_estimation.inputs.template_str = _TEMPLATES["estimation"]
 
         # 3. Contrast
         model_contrast = npe.Node(
             nutil.Function(
-                input_names=["mat_file", "template_file", "covariates", "class_names"],
+                input_names=[
+                    "mat_file",
+                    "template_file",
+                    "covariates",
+                    "class_names",
+                    "template_str",
+                ],
                 output_names=["script_file"],
                 function=clean_spm_contrast_file,
             ),
             name="model_contrast",
         )
-        model_contrast.inputs.template_file = join(
-            dirname(__file__), "template_model_contrast.m"
-        )
+        model_contrast.inputs.template_file = _TEMPLATE_FILES["contrast"]
+        model_contrast.inputs.template_str = _TEMPLATES["contrast"]
 
         # 4. Results
         model_result_no_correction = npe.Node(
             nutil.Function(
-                input_names=["mat_file", "template_file", "method", "threshold"],
+                input_names=[
+                    "mat_file",
+                    "template_file",
+                    "method",
+                    "threshold",
+                    "template_str",
+                ],
                 output_names=["script_file"],
                 function=clean_spm_result_file,
             ),
             name="model_result_no_correction",
         )
-        model_result_no_correction.inputs.template_file = join(
-            dirname(__file__), "template_model_results.m"
-        )
+        model_result_no_correction.inputs.template_file = _TEMPLATE_FILES["results"]
+        model_result_no_correction.inputs.template_str = _TEMPLATES["results"]
 
         model_result_no_correction.inputs.method = "none"
         model_result_no_correction.inputs.threshold = self.parameters[
@@ -433,35 +447,56 @@ class StatisticsVolume(GroupPipeline):
         read_output_node.inputs.fwhm = self.parameters["full_width_at_half_maximum"]
         read_output_node.inputs.measure = self.parameters["measure_label"]
 
+        # SPM cannot handle zipped files
+        # Decompression is skipped when none of the input files is zipped
+        if self._needs_unzip:
+            unzip_node = npe.MapNode(
+                nutil.Function(
+                    input_names=["in_file"],
+                    output_names=["output_files"],
+                    function=unzip_nii,
+                ),
+                name="unzip_node",
+                iterfield=["in_file"],
+            )
+            self.connect([(self.input_node, unzip_node, [("input_files", "in_file")])])
+            file_list_source, file_list_field = unzip_node, "output_files"
+        else:
+            file_list_source, file_list_field = self.input_node, "input_files"
+
         # Connection
         # ==========
         # fmt: off
         self.connect(
             [
-                (self.input_node, unzip_node, [("input_files", "in_file")]),
-                (unzip_node, model_creation, [("output_files", "file_list")]),
-                (get_groups, model_creation, [("idx_group1", "idx_group1")]),
-                (get_groups, model_creation, [("idx_group2", "idx_group2")]),
+                (file_list_source, model_creation, [(file_list_field, "file_list")]),
+                (get_groups, model_creation, [("idx_group1", "idx_group1"), ("idx_group2", "idx_group2")]),
+                (get_groups, model_contrast, [("class_names", "class_names")]),
+                (get_groups, read_output_node, [("class_names", "class_names")]),
                 (model_creation, run_spm_model_creation, [("script_file", "m_file")]),
+                (model_creation, model_contrast, [("covariates", "covariates")]),
+                (model_creation, read_output_node, [("covariates", "covariates")]),
                 (run_spm_model_creation, model_estimation, [("spm_mat", "mat_file")]),
                 (model_estimation, run_spm_model_estimation, [("script_file", "m_file")]),
-                (get_groups, model_contrast, [("class_names", "class_names")]),
                 (run_spm_model_estimation, model_contrast, [("spm_mat", "mat_file")]),
-                (model_creation, model_contrast, [("covariates", "covariates")]),
                 (model_contrast, run_spm_model_contrast, [("script_file", "m_file")]),
                 (run_spm_model_contrast, model_result_no_correction, [("spm_mat", "mat_file")]),
                 (model_result_no_correction, run_spm_model_result_no_correction, [("script_file", "m_file")]),
                 (run_spm_model_result_no_correction, read_output_node, [("spm_mat", "spm_mat")]),
-                (get_groups, read_output_node, [("class_names", "class_names")]),
-                (model_creation, read_output_node, [("covariates", "covariates")]),
-                (read_output_node, self.output_node, [(("spm_T_maps", _getter, 0), "spmT_0001")]),
-                (read_output_node, self.output_node, [(("spm_T_maps", _getter, 1), "spmT_0002")]),
-                (read_output_node, self.output_node, [("spm_figures", "spm_figures")]),
-                (read_output_node, self.output_node, [(("other_spm_files", _getter, 0), "variance_of_error")]),
-                (read_output_node, self.output_node, [(("other_spm_files", _getter, 1), "resels_per_voxels")]),
-                (read_output_node, self.output_node, [(("other_spm_files", _getter, 2), "mask")]),
-                (read_output_node, self.output_node, [("regression_coeff", "regression_coeff")]),
-                (read_output_node, self.output_node, [("contrasts", "contrasts")]),
+                (
+                    read_output_node,
+                    self.output_node,
+                    [
+                        (("spm_T_maps", _getter, 0), "spmT_0001"),
+                        (("spm_T_maps", _getter, 1), "spmT_0002"),
+                        ("spm_figures", "spm_figures"),
+                        (("other_spm_files", _getter, 0), "variance_of_error"),
+                        (("other_spm_files", _getter, 1), "resels_per_voxels"),
+                        (("other_spm_files", _getter, 2), "mask"),
+                        ("regression_coeff", "regression_coeff"),
+                        ("contrasts", "contrasts"),
+                    ],
+                ),
             ]
         )
         # fmt: on
@@ -74,6 +74,7 @@ def write_matlab_model(
     idx_group2: list,
     file_list: list,
     template_file: str,
+    template_str: str = None,
 ):
     """Create the matlab .m file for the instantiation of the 2-sample t-test model in SPM
 
@@ -91,6 +92,8 @@ def write_matlab_model(
         List of files used in the statistical test. Their order is the same as it appears on the tsv file
     template_file: str
         Path to the template file used to generate the .m file
+    template_str: str, optional
+        Content of the template file. If provided, the template file is not read.
 
     Returns
     -------
@@ -113,8 +116,12 @@ def write_matlab_model(
     from clinica.utils.exceptions import ClinicaException
 
     # Get template for model creation
-    if not isfile(template_file):
-        raise RuntimeError("[Error] " + template_file + " could not be found !")
+    if template_str is None:
+        if not isfile(template_file):
+            raise RuntimeError("[Error] " + template_file + " could not be found !")
+        with open(template_file, "r") as file:
+            template_str = file.read()
+    filedata = template_str
 
     # Create current model filename
     current_model = abspath("./current_model_creation.m")
@@ -122,9 +129,6 @@ def write_matlab_model(
     if isfile(current_model):
         remove(current_model)
 
-    with open(template_file, "r") as file:
-        filedata = file.read()
-
     output_folder = _create_spm_output_folder(current_model)
 
     # Replace string in matlab file to set the output directory, and all the scans used for group 1 and 2
@@ -544,7 +548,9 @@ def _add_spm_path_to_matlab_script(m_file: str) -> None:
         fp.writelines(lines)
 
 
-def clean_template_file(mat_file: str, template_file: str) -> str:
+def clean_template_file(
+    mat_file: str, template_file: str, template_str: str = None
+) -> str:
     """Make a copy of the template file (for estimation) and replace
     @SPMMAT by the real path to SPM.mat (mat_file).
 
@@ -554,6 +560,8 @@ def clean_template_file(mat_file: str, template_file: str) -> str:
         Path to the SPM.mat file of the SPM analysis
     template_file: str
         Path to the template file for the estimation of the model
+    template_str: str, optional
+        Content of the template file. If provided, the template file is not read.
 
     Returns
     -------
@@ -562,10 +570,11 @@ def clean_template_file(mat_file: str, template_file: str) -> str:
     """
     from os.path import abspath
 
-    with open(template_file, "r") as file:
-        filedata = file.read()
+    if template_str is None:
+        with open(template_file, "r") as file:
+            template_str = file.read()
     # Replace by the real path to spm.mat
-    filedata = filedata.replace("@SPMMAT", "'" + mat_file + "'")
+    filedata = template_str.replace("@SPMMAT", "'" + mat_file + "'")
     current_model_estimation = abspath("./current_model_creation.m")
     with open(current_model_estimation, "w+") as file:
         file.write(filedata)
@@ -578,6 +587,7 @@ def clean_spm_result_file(
     template_file: str,
     method: str,
     threshold: float,
+    template_str: str = None,
 ) -> str:
     """Make a copy of the template file (for results) and replace
     @SPMMAT by the real path to SPM.mat (mat_file).
@@ -592,6 +602,8 @@ def clean_spm_result_file(
         method. In our case, "none"
     threshold: float
         cluster threshold
+    template_str: str, optional
+        Content of the template file. If provided, the template file is not read.
 
     Returns
     -------
@@ -602,10 +614,11 @@ def clean_spm_result_file(
     from os.path import abspath
 
     # Read template
-    with open(template_file, "r") as file:
-        filedata = file.read()
+    if template_str is None:
+        with open(template_file, "r") as file:
+            template_str = file.read()
     # Replace by the real path to spm.mat
-    filedata = filedata.replace("@SPMMAT", "'" + mat_file + "'")
+    filedata = template_str.replace("@SPMMAT", "'" + mat_file + "'")
     filedata = filedata.replace("@CORRECTIONMETHOD", "'" + method + "'")
     filedata = filedata.replace("@THRESH", str(threshold))
     if method != "none":
@@ -623,6 +636,7 @@ def clean_spm_contrast_file(
     template_file: str,
     covariates: list,
     class_names: list,
+    template_str: str = None,
 ):
     """Make a copy of the template file (for results) and replace
     @SPMMAT, @COVARNUMBER, @GROUP1, @GROUP2 by the corresponding variables.
@@ -637,6 +651,8 @@ def clean_spm_contrast_file(
         List of covariates
     class_names: list of str
         Corresponds to the 2 classes for the group comparison
+    template_str: str, optional
+        Content of the template file. If provided, the template file is not read.
 
     Returns
     -------
@@ -647,10 +663,11 @@ def clean_spm_contrast_file(
 
     number_of_covariates = len(covariates)
 
-    with open(template_file, "r") as file:
-        filedata = file.read()
+    if template_str is None:
+        with open(template_file, "r") as file:
+            template_str = file.read()
     # Replace by the real path to spm.mat
-    filedata = filedata.replace("@SPMMAT", "'" + mat_file + "'")
+    filedata = template_str.replace("@SPMMAT", "'" + mat_file + "'")
     filedata = filedata.replace("@COVARNUMBER", "0 " * number_of_covariates)
     filedata = filedata.replace("@GROUP1", "'" + class_names[0] + "'")
     filedata = filedata.replace("@GROUP2", "'" + class_names[1] + "'")
@@ -0,0 +1,30 @@
+import pytest
+from click.testing import CliRunner
+
+
+@pytest.mark.parametrize("cluster_threshold", ["1.5", "-0.1"])
+def test_cluster_threshold_out_of_range_rejected(tmp_path, mocker, cluster_threshold):
+    from clinica.pipelines.statistics_volume.statistics_volume_cli import cli
+
+    pipeline = mocker.patch(
+        "clinica.pipelines.statistics_volume.statistics_volume_pipeline.StatisticsVolume"
+    )
+    tsv = tmp_path / "subjects.tsv"
+    tsv.write_text("participant_id\tsession_id\tgroup\n")
+
+    result = CliRunner().invoke(
+        cli,
+        [
+            str(tmp_path),
+            "UnitTest",
+            "t1-volume",
+            str(tsv),
+            "group",
+            "-ct",
+            cluster_threshold,
+        ],
+    )
+
+    assert result.exit_code == 2
+    assert "is not in the range 0<=x<=1" in result.output
+    pipeline.assert_not_called()
@@ -0,0 +1,137 @@
+import pytest
+
+
+def test_build_regexp_substitutions_escapes_base_dir(tmp_path):
+    import re
+
+    from clinica.pipelines.statistics_volume.statistics_volume_pipeline import (
+        _build_regexp_substitutions,
+    )
+
+    base_dir = tmp_path / "group-UnitTest+1.0" / "statistics_volume"
+    substitutions = _build_regexp_substitutions(base_dir, "group-UnitTest", "fdg", 8)
+
+    assert len(substitutions) == 8
+    assert all(isinstance(pattern, str) for pattern, _ in substitutions)
+    pattern, replacement = substitutions[0]
+    assert re.sub(
+        pattern, replacement, str(base_dir / "spm_results_analysis_1" / "foo.nii")
+    ) == str(base_dir / "foo.nii")
+    # Without escaping, '+' and '.' in the output directory would match this path
+    assert not re.match(
+        pattern,
+        str(
+            tmp_path
+            / "group-UnitTest1_0"
+            / "statistics_volume"
+            / "spm_results_analysis_1"
+            / "foo.nii"
+        ),
+    )
+    pattern, replacement = substitutions[-1]
+    assert re.sub(
+        pattern, replacement, str(base_dir / "regression_coeff" / "age.nii")
+    ) == str(
+        base_dir
+        / "group-UnitTest_covariate-age_measure-fdg_fwhm-8_regressionCoefficient.nii"
+    )
+
+
+def test_cluster_threshold_out_of_range(tmp_path, mocker):
+    from packaging.version import Version
+
+    from clinica.pipelines.statistics_volume.statistics_volume_pipeline import (
+        StatisticsVolume,
+    )
+    from clinica.utils.exceptions import ClinicaException
+    from clinica.utils.testing_utils import build_caps_directory
+
+    mocker.patch(
+        "clinica.utils.check_dependency._get_spm_version",
+        return_value=Version("12.7219"),
+    )
+    caps = build_caps_directory(
+        tmp_path / "caps",
+        {"pipelines": ["t1-volume"], "subjects": {"sub-01": ["ses-M000"]}},
+    )
+    pipeline = StatisticsVolume(
+        caps_directory=str(caps),
+        group_label="test",
+        parameters={
+            "orig_input_data_volume": "t1-volume",
+            "contrast": "group",
+            "cluster_threshold": 1.5,
+        },
+    )
+
+    with pytest.raises(ClinicaException, match="Cluster threshold should be between"):
+        pipeline._check_pipeline_parameters()
+
+
+def _build_statistics_volume_pipeline(tmp_path, mocker, input_files):
+    from packaging.version import Version
+
+    from clinica.pipelines.statistics_volume.statistics_volume_pipeline import (
+        StatisticsVolume,
+    )
+    from clinica.utils.testing_utils import build_caps_directory
+
+    mocker.patch(
+        "clinica.utils.check_dependency._get_spm_version",
+        return_value=Version("12.7219"),
+    )
+    mocker.patch(
+        "clinica.utils.inputs.clinica_file_filter",
+        return_value=(input_files, ["sub-01", "sub-02"], ["ses-M000", "ses-M000"]),
+    )
+    caps = build_caps_directory(
+        tmp_path / "caps",
+        {
+            "pipelines": ["t1-volume"],
+            "subjects": {"sub-01": ["ses-M000"], "sub-02": ["ses-M000"]},
+        },
+    )
+    tsv = tmp_path / "subjects.tsv"
+    tsv.write_text(
+        "participant_id\tsession_id\tgroup\nsub-01\tses-M000\tA\nsub-02\tses-M000\tB\n"
+    )
+    pipeline = StatisticsVolume(
+        caps_directory=str(caps),
+        group_label="UnitTest",
+        tsv_file=str(tsv),
+        base_dir=str(tmp_path / "wd"),
+        parameters={"orig_input_data_volume": "t1-volume", "contrast": "group"},
+        ignore_dependencies=["spm"],
+    )
+
+    return pipeline.build()
+
+
+def _get_file_list_source(pipeline):
+    model_creation = pipeline.get_node("model_creation")
+    for source, _, data in pipeline._graph.in_edges(model_creation, data=True):
+        for source_field, destination_field in data["connect"]:
+            if destination_field == "file_list":
+                return source, source_field
+
+
+def test_build_core_nodes_without_unzip(tmp_path, mocker):
+    pipeline = _build_statistics_volume_pipeline(
+        tmp_path, mocker, ["sub-01_T1w.nii", "sub-02_T1w.nii"]
+    )
+
+    assert pipeline.get_node("unzip_node") is None
+    assert _get_file_list_source(pipeline) == (pipeline.input_node, "input_files")
+
+
+def test_build_core_nodes_with_unzip(tmp_path, mocker):
+    import nipype.pipeline.engine as npe
+
+    pipeline = _build_statistics_volume_pipeline(
+        tmp_path, mocker, ["sub-01_T1w.nii.gz", "sub-02_T1w.nii"]
+    )
+    unzip_node = pipeline.get_node("unzip_node")
+
+    assert isinstance(unzip_node, npe.MapNode)
+    assert unzip_node.iterfield == ["in_file"]
+    assert _get_file_list_source(pipeline) == (unzip_node, "output_files")
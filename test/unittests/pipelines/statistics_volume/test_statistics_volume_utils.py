@@ -762,3 +762,93 @@ def test_copy_and_rename_spm_output_files(tmp_path):
             "group-group_B-lt-A_measure-measure_contrast.nii",
         )
     }
+
+
+@pytest.mark.parametrize("use_template_str", [True, False])
+@pytest.mark.parametrize(
+    "function_name,kwargs,template,expected",
+    [
+        (
+            "clean_template_file",
+            {},
+            "foo = @SPMMAT;\nbar",
+            "foo = 'SPM.mat';\nbar",
+        ),
+        (
+            "clean_spm_contrast_file",
+            {"covariates": ["age", "sex"], "class_names": ["A", "B"]},
+            "foo = @SPMMAT;\nbar = [1 -1 @COVARNUMBER];\nbaz = {@GROUP1, @GROUP2};",
+            "foo = 'SPM.mat';\nbar = [1 -1 0 0 ];\nbaz = {'A', 'B'};",
+        ),
+        (
+            "clean_spm_result_file",
+            {"method": "none", "threshold": 0.001},
+            "foo = @SPMMAT;\nbar = @CORRECTIONMETHOD;\nbaz = @THRESH;",
+            "foo = 'SPM.mat';\nbar = 'none';\nbaz = 0.001;",
+        ),
+    ],
+)
+def test_clean_spm_template_files(
+    tmp_path, monkeypatch, function_name, kwargs, template, expected, use_template_str
+):
+    from clinica.pipelines.statistics_volume import statistics_volume_utils
+
+    template_file = tmp_path / "template.m"
+    if not use_template_str:
+        template_file.write_text(template)
+    monkeypatch.chdir(tmp_path)
+    result = getattr(statistics_volume_utils, function_name)(
+        mat_file="SPM.mat",
+        template_file=str(template_file),
+        template_str=template if use_template_str else None,
+        **kwargs,
+    )
+
+    assert Path(result).read_text() == expected
+
+
+def test_write_matlab_model_with_template_str(tmp_path, monkeypatch):
+    from clinica.pipelines.statistics_volume.statistics_volume_utils import (
+        write_matlab_model,
+    )
+
+    tsv = tmp_path / "data.tsv"
+    tsv.write_text(_get_tsv_data_two_classes())
+    (tmp_path / "work").mkdir()
+    monkeypatch.chdir(tmp_path / "work")
+    current_model, covariates = write_matlab_model(
+        str(tsv),
+        "group",
+        [0, 2],
+        [1, 3],
+        [f"file_{i}" for i in range(1, 5)],
+        template_file=str(tmp_path / "missing.m"),
+        template_str="foo @OUTPUTDIR\nbar @SCANS1\nbaz @SCANS2\n",
+    )
+
+    assert covariates == ["age", "sex"]
+    content = Path(current_model).read_text()
+    assert str(Path.cwd().parent / "2_sample_t_test") in content
+    for tag in ("@OUTPUTDIR", "@SCANS1", "@SCANS2"):
+        assert tag not in content
+    assert content.endswith("spm_jobman('run', matlabbatch)")
+
+
+def test_write_matlab_model_missing_template_file(tmp_path, monkeypatch):
+    from clinica.pipelines.statistics_volume.statistics_volume_utils import (
+        write_matlab_model,
+    )
+
+    tsv = tmp_path / "data.tsv"
+    tsv.write_text(_get_tsv_data_two_classes())
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(RuntimeError, match="could not be found"):
+        write_matlab_model(
+            str(tsv),
+            "group",
+            [0, 2],
+            [1, 3],
+            [f"file_{i}" for i in range(1, 5)],
+            template_file=str(tmp_path / "missing.m"),
+            template_str=None,
+        )